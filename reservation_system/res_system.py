@@ -1,7 +1,216 @@
 """
 Module that defines the functionality of the hotel reservations project
 """
+import logging
+import os
 import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from urllib.parse import quote
+
+_log = logging.getLogger(__name__)
+
+_SQL_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS "Hotel" (
+        "ID"	INTEGER NOT NULL UNIQUE,
+        "NAME"	TEXT NOT NULL UNIQUE,
+        "LOCATION"	TEXT NOT NULL UNIQUE,
+        PRIMARY KEY("ID" AUTOINCREMENT)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS "Customer" (
+        "ID"	INTEGER NOT NULL UNIQUE,
+        "NAME"	TEXT NOT NULL,
+        "EMAIL"	TEXT NOT NULL UNIQUE,
+        PRIMARY KEY("ID" AUTOINCREMENT)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS "Reservation" (
+        "ID"	INTEGER NOT NULL UNIQUE,
+        "HOTEL_ID"	INTEGER NOT NULL,
+        "CUSTOMER_ID"	INTEGER NOT NULL,
+        "DATE"	TEXT NOT NULL,
+        "NIGHTS"	INTEGER NOT NULL,
+        FOREIGN KEY("HOTEL_ID")
+            REFERENCES "Hotel"("ID") ON DELETE RESTRICT,
+        PRIMARY KEY("ID" AUTOINCREMENT),
+        FOREIGN KEY("CUSTOMER_ID")
+            REFERENCES "Customer"("ID") ON DELETE RESTRICT
+    )
+    """,
+)
+
+_SQL_CREATE_INDEXES = (
+    """
+    CREATE INDEX IF NOT EXISTS "idx_res_hc_date"
+        ON "Reservation"("HOTEL_ID", "CUSTOMER_ID", "DATE")
+    """,
+)
+_SQL_DROP_INDEXES = (
+    'DROP INDEX IF EXISTS "idx_res_hc_date"',
+)
+
+_SQL_INSERT_HOTEL = "INSERT INTO Hotel (NAME, LOCATION) VALUES (?, ?)"
+_SQL_INSERT_CUSTOMER = "INSERT INTO Customer (NAME, EMAIL) VALUES (?, ?)"
+_SQL_INSERT_RESERVATION = (
+    "INSERT INTO Reservation "
+    "(HOTEL_ID, CUSTOMER_ID, DATE, NIGHTS) "
+    "VALUES (?, ?, ?, ?)"
+)
+_SQL_INSERT_RESERVATION_ROWS = (
+    "INSERT INTO Reservation "
+    "(HOTEL_ID, CUSTOMER_ID, DATE, NIGHTS) "
+    "VALUES "
+)
+_SQL_RESERVATION_ROW = "(?, ?, ?, ?)"
+_SQL_INSERT_HOTEL_RETURNING = _SQL_INSERT_HOTEL + " RETURNING ID"
+_SQL_INSERT_CUSTOMER_RETURNING = _SQL_INSERT_CUSTOMER + " RETURNING ID"
+_SQL_INSERT_RESERVATION_RETURNING = _SQL_INSERT_RESERVATION + " RETURNING ID"
+_SQL_UPDATE_HOTEL = "UPDATE Hotel SET NAME = ?, LOCATION = ? WHERE ID = ?"
+_SQL_UPDATE_CUSTOMER = "UPDATE Customer SET name = ?, email = ? WHERE ID = ?"
+_SQL_DELETE_HOTEL = "DELETE FROM Hotel WHERE ID = ?"
+_SQL_DELETE_CUSTOMER = "DELETE FROM Customer WHERE ID = ?"
+_SQL_DELETE_RESERVATION = "DELETE FROM Reservation WHERE ID = ?"
+_SQL_SELECT_HOTELS_PAGE = (
+    "SELECT * FROM Hotel WHERE ID > ? ORDER BY ID LIMIT ?"
+)
+_SQL_SELECT_CUSTOMERS_PAGE = (
+    "SELECT * FROM Customer WHERE ID > ? ORDER BY ID LIMIT ?"
+)
+_SQL_SELECT_RESERVATIONS_PAGE = (
+    "SELECT * FROM Reservation WHERE ID > ? ORDER BY ID LIMIT ?"
+)
+_SQL_COUNT_RESERVATIONS = "SELECT COUNT(*) FROM Reservation"
+_SQL_SELECT_RESERVATION_COLUMNS = (
+    "SELECT ID, HOTEL_ID, CUSTOMER_ID, DATE, NIGHTS FROM Reservation"
+)
+_SQL_SELECT_HOTEL_BY_ID = "SELECT * FROM Hotel WHERE ID = ?"
+_SQL_SELECT_CUSTOMER_BY_ID = "SELECT * FROM Customer WHERE ID = ?"
+_SQL_SELECT_RESERVATION_BY_ID = "SELECT * FROM Reservation WHERE ID = ?"
+_SQL_SELECT_HOTEL_BY_NAME = "SELECT * FROM Hotel WHERE NAME = ?"
+_SQL_SELECT_CUSTOMER_BY_EMAIL = "SELECT * FROM Customer WHERE EMAIL = ?"
+_SQL_SELECT_RESERVATION_BY_DETAILS = (
+    "SELECT r.* FROM Reservation r "
+    "JOIN Hotel h ON r.HOTEL_ID = h.ID "
+    "JOIN Customer c ON r.CUSTOMER_ID = c.ID "
+    "WHERE h.NAME = ? AND c.EMAIL = ? AND r.DATE = ?"
+)
+_SQL_LAST_INSERT_ROWID = "SELECT last_insert_rowid()"
+
+_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA SQLITE_ALLOW_EMPTY_STRING = 0",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA mmap_size = 268435456",
+)
+
+_CACHE_SIZE = 128
+
+# Rows fetched per batch when streaming whole tables
+_ITER_BATCH_SIZE = 256
+
+# INSERT ... RETURNING is only available from SQLite 3.35 onwards
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_HOTEL_FORMAT = "{0.name} ({0.location})"
+_CUSTOMER_FORMAT = "{0.name} ({0.email})"
+_RESERVATION_FORMAT = (
+    "Reservation ID: {0.reservation_id},"
+    "Hotel ID: {0.hotel_id},"
+    "Customer ID: {0.customer_id},"
+    "Check-in: {0.check_in_date},"
+    "Nights: {0.nights}"
+)
+
+# Database names SQLite opens as a new private database per connection
+_PRIVATE_DATABASES = (":memory:", "")
+
+# Set to any non-empty value to count executed statements per handler
+_TRACE_ENV_VAR = "RES_SQL_TRACE"
+_TRACE_KEY_LENGTH = 32
+
+_RESERVATION_COLUMNS = ["HOTEL_ID", "CUSTOMER_ID", "DATE", "NIGHTS"]
+
+_RESERVATION_FIELDS = {
+    "hotel_id": "HOTEL_ID",
+    "customer_id": "CUSTOMER_ID",
+    "date": "DATE",
+    "nights": "NIGHTS",
+}
+
+# UPDATE statements generated per set of reservation fields
+_UPDATE_RESERVATION_SQL = {}
+
+# Savepoint nesting levels whose statements should stay prepared
+_SAVEPOINT_DEPTHS = 4
+
+# Prepared statements a connection can cycle through: the SQL constants
+# and DDL, the pragmas and journal mode, BEGIN/BEGIN IMMEDIATE/COMMIT/
+# ROLLBACK, SAVEPOINT/RELEASE/ROLLBACK TO per nesting level, every UPDATE
+# shape update_reservation_fields() can generate, and the full and final
+# multi-row INSERT of a load_reservations() call
+_STATEMENT_CACHE_SIZE = (
+    sum(
+        len(value) if isinstance(value, tuple) else 1
+        for name, value in list(globals().items())
+        if name.startswith("_SQL_")
+    )
+    + len(_PRAGMAS) + 1
+    + 4
+    + 3 * _SAVEPOINT_DEPTHS
+    + 2 ** len(_RESERVATION_FIELDS) - 1
+    + 2
+)
+
+
+def _update_reservation_sql(fields):
+    """
+    Return the UPDATE statement that sets only the given fields,
+    in the given order.
+    """
+    sql = _UPDATE_RESERVATION_SQL.get(fields)
+    if sql is None:
+        sql = (
+            "UPDATE Reservation SET "
+            + ", ".join(f"{_RESERVATION_FIELDS[f]} = ?" for f in fields)
+            + " WHERE ID = ?"
+        )
+        _UPDATE_RESERVATION_SQL[fields] = sql
+    return sql
+
+
+# Write locks shared by the shared-cache handlers of each database file
+_SHARED_WRITE_LOCKS = {}
+_SHARED_WRITE_LOCKS_GUARD = threading.Lock()
+
+
+def _shared_write_lock(db_name):
+    """
+    Return the write lock shared by every shared-cache handler of the
+    given database file in this process.
+    """
+    path = os.path.realpath(db_name)
+    with _SHARED_WRITE_LOCKS_GUARD:
+        return _SHARED_WRITE_LOCKS.setdefault(path, threading.RLock())
+
+
+@lru_cache(maxsize=None)
+def _insert_reservation_rows_sql(count):
+    """
+    Build the multi-row INSERT statement for count reservations.
+    """
+    return _SQL_INSERT_RESERVATION_ROWS + ", ".join(
+        [_SQL_RESERVATION_ROW] * count
+    )
 
 
 class DatabaseHandler:
@@ -10,77 +219,391 @@ class DatabaseHandler:
     Hotel, Customer, and Reservation entities.
     """
 
-    def __init__(self, db_name):
+    def __init__(self, db_name, cache=False, shared_cache=False):
         """
         Initialize the DatabaseHandler with the given database name.
+        When cache is True, hotel and customer lookups are memoized
+        in memory and invalidated on every write.
+
+        File databases get a writer connection, guarded by a lock, and a
+        separate reader connection so lookups are not blocked by writes.
+
+        When shared_cache is True, the writer connection of a file
+        database is opened in SQLite's shared-cache mode, so handlers in
+        the same process writing to it share one page cache. The reader
+        connection keeps a private cache: shared-cache table locks would
+        otherwise make lookups fail while a write is in progress.
+        Writers sharing the cache fail at once with "database table is
+        locked" instead of waiting, so shared-cache handlers of the same
+        file also share one write lock and take turns. A thread must not
+        write through one of them while holding a transaction() on
+        another.
         """
         self.db_name = db_name
-        self.connection = sqlite3.connect(db_name)
-        self.connection.execute("PRAGMA foreign_keys = ON")
-        self.connection.execute("PRAGMA SQLITE_ALLOW_EMPTY_STRING = 0")
+        self._private = db_name in _PRIVATE_DATABASES
+        self._trace = Counter() if os.environ.get(_TRACE_ENV_VAR) else None
+        self._trace_lock = threading.Lock()
+        if shared_cache and not self._private:
+            self.connection = self._connect(
+                f"file:{quote(db_name)}?cache=shared&mode=rwc",
+                uri=True
+            )
+            self._write_lock = _shared_write_lock(db_name)
+        else:
+            self.connection = self._connect(db_name)
+            self._write_lock = threading.RLock()
+        if self._private:
+            self._read = self.connection
+        else:
+            self._read = self._connect(db_name)
         self.cursor = self.connection.cursor()
+        self._tx_owner = None
+        self._in_tx = 0
+        self._hotel_cache = {} if cache else None
+        self._customer_cache = {} if cache else None
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
+        self._stale = []
         self.create_tables_if_not_exist()
 
     def create_tables_if_not_exist(self):
         """
         Create the tables if they don't already exist in the database.
         """
-        create_hotel_table = """
-            CREATE TABLE IF NOT EXISTS "Hotel" (
-                "ID"	INTEGER NOT NULL UNIQUE,
-                "NAME"	TEXT NOT NULL UNIQUE,
-                "LOCATION"	TEXT NOT NULL UNIQUE,
-                PRIMARY KEY("ID" AUTOINCREMENT)
-            )
+        with self.transaction():
+            self._execute_all(_SQL_DDL)
+            self.create_indexes()
+
+    def create_indexes(self):
         """
-        create_customer_table = """
-            CREATE TABLE IF NOT EXISTS "Customer" (
-                "ID"	INTEGER NOT NULL UNIQUE,
-                "NAME"	TEXT NOT NULL,
-                "EMAIL"	TEXT NOT NULL UNIQUE,
-                PRIMARY KEY("ID" AUTOINCREMENT)
-            )
+        Create the secondary indexes if they don't already exist.
         """
-        create_reservation_table = """
-            CREATE TABLE IF NOT EXISTS "Reservation" (
-                "ID"	INTEGER NOT NULL UNIQUE,
-                "HOTEL_ID"	INTEGER NOT NULL,
-                "CUSTOMER_ID"	INTEGER NOT NULL,
-                "DATE"	TEXT NOT NULL,
-                "NIGHTS"	INTEGER NOT NULL,
-                FOREIGN KEY("HOTEL_ID")
-                    REFERENCES "Hotel"("ID") ON DELETE RESTRICT,
-                PRIMARY KEY("ID" AUTOINCREMENT),
-                FOREIGN KEY("CUSTOMER_ID")
-                    REFERENCES "Customer"("ID") ON DELETE RESTRICT
-            )
+        with self.transaction():
+            self._execute_all(_SQL_CREATE_INDEXES)
+
+    def drop_indexes(self):
+        """
+        Drop the secondary indexes, e.g. before a large bulk load.
+        Call create_indexes() once the load is finished. Both can run
+        inside the same transaction() as the load.
+        """
+        with self.transaction():
+            self._execute_all(_SQL_DROP_INDEXES)
+
+    def _execute_all(self, statements):
+        """
+        Execute each statement on the writer connection.
+        """
+        for statement in statements:
+            self.connection.execute(statement)
+
+    def _connect(self, database, uri=False):
+        """
+        Open a connection in autocommit mode with the handler's pragmas.
+        """
+        connection = sqlite3.connect(
+            database,
+            uri=uri,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=_STATEMENT_CACHE_SIZE
+        )
+        connection.row_factory = sqlite3.Row
+        if self._trace is not None:
+            connection.set_trace_callback(self._tracer)
+        for pragma in _PRAGMAS:
+            connection.execute(pragma)
+        if not self._private:
+            connection.execute("PRAGMA journal_mode = WAL")
+        return connection
+
+    def _tracer(self, sql):
+        """
+        Count an executed statement by its leading characters. The
+        reader connection is shared across threads, hence the lock.
         """
+        key = " ".join(sql.split())[:_TRACE_KEY_LENGTH]
+        with self._trace_lock:
+            self._trace[key] += 1
 
-        self.cursor.execute(create_hotel_table)
-        self.cursor.execute(create_customer_table)
-        self.cursor.execute(create_reservation_table)
-        self.connection.commit()
+    def _dump_trace(self):
+        """
+        Log the statement counts collected by the tracer.
+        """
+        with self._trace_lock:
+            counts = self._trace.most_common()
+        _log.info("SQL trace for %s:", self.db_name)
+        for sql, count in counts:
+            _log.info("%10d  %s", count, sql)
+
+    def _reader(self):
+        """
+        Return the connection lookups should use. Inside a transaction
+        owned by the current thread that is the writer, so uncommitted
+        changes stay visible.
+        """
+        if self._in_tx and self._tx_owner == threading.get_ident():
+            return self.connection
+        return self._read
 
     def close_connection(self):
         """
-        Close the database connection.
+        Close the database connections.
         """
+        if self._trace is not None:
+            self._dump_trace()
+        if self._read is not self.connection:
+            self._read.close()
         self.connection.close()
 
+    @contextmanager
+    def transaction(self, rollback=False):
+        """
+        Group several operations into a single write transaction.
+        Nested calls open a savepoint inside the outer transaction.
+        Changes are committed on exit, or rolled back if an exception
+        is raised or rollback is True.
+        """
+        with self._write_lock:
+            depth = self._in_tx
+            if depth:
+                self.connection.execute(f"SAVEPOINT sp_{depth}")
+            else:
+                self.connection.execute("BEGIN IMMEDIATE")
+                self._tx_owner = threading.get_ident()
+            self._in_tx += 1
+            rolled_back = False
+            try:
+                yield self
+                if rollback:
+                    rolled_back = True
+                    self._rollback(depth)
+                else:
+                    self._release(depth)
+            except BaseException:
+                # Also covers a failed COMMIT/RELEASE, which would
+                # otherwise leave the connection inside the transaction
+                if not rolled_back:
+                    self._rollback(depth)
+                raise
+            finally:
+                self._in_tx -= 1
+                if not self._in_tx:
+                    self._tx_owner = None
+                    self._drop_stale()
+
+    def _release(self, depth):
+        """
+        Commit the transaction or release the savepoint opened at depth.
+        """
+        if depth:
+            self.connection.execute(f"RELEASE sp_{depth}")
+        else:
+            self.connection.execute("COMMIT")
+
+    def _rollback(self, depth):
+        """
+        Roll back the transaction or savepoint opened at depth.
+        """
+        if depth:
+            self.connection.execute(f"ROLLBACK TO sp_{depth}")
+            self.connection.execute(f"RELEASE sp_{depth}")
+        else:
+            self.connection.execute("ROLLBACK")
+        self._clear_caches()
+
+    def _clear_caches(self):
+        """
+        Drop every memoized hotel and customer lookup.
+        """
+        with self._cache_lock:
+            self._cache_generation += 1
+            for cache in (self._hotel_cache, self._customer_cache):
+                if cache is not None:
+                    cache.clear()
+
+    def _invalidate(self, cache, attribute, value):
+        """
+        Drop the cached entries whose given attribute matches value.
+        They are dropped again once the transaction ends, in case
+        another thread cached the old row in the meantime.
+        """
+        if cache is None:
+            return
+        with self._cache_lock:
+            self._stale.append((cache, attribute, value))
+            self._drop(cache, attribute, value)
+
+    def _drop_stale(self):
+        """
+        Drop the entries invalidated during the transaction that just
+        ended and stop in-flight lookups from caching older rows.
+        """
+        with self._cache_lock:
+            self._cache_generation += 1
+            for cache, attribute, value in self._stale:
+                self._drop(cache, attribute, value)
+            self._stale.clear()
+
+    @staticmethod
+    def _drop(cache, attribute, value):
+        """
+        Remove the entries whose given attribute matches value.
+        """
+        stale = [
+            key for key, entity in cache.items()
+            if getattr(entity, attribute) == value
+        ]
+        for key in stale:
+            del cache[key]
+
+    def _lookup(self, cache, key, sql, params, entity_class):
+        """
+        Fetch a single row as an entity, going through the cache if
+        it is enabled. Missing rows are never cached, and neither are
+        rows read while a transaction is open on the connection used.
+        """
+        if cache is not None:
+            entity = cache.get(key)
+            if entity is not None:
+                return entity
+        generation = self._cache_generation
+        writing = self._in_tx or self._read.in_transaction
+        result = self._reader().execute(sql, params).fetchone()
+        entity = entity_class(*result) if result else None
+        if cache is None or entity is None or writing:
+            return entity
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                if len(cache) >= _CACHE_SIZE:
+                    del cache[next(iter(cache))]
+                cache[key] = entity
+        return entity
+
+    def _inserted_ids(self, count):
+        """
+        Return the range of IDs assigned by the last bulk insert.
+        """
+        if not count:
+            return range(0)
+        self.cursor.execute(_SQL_LAST_INSERT_ROWID)
+        last_id = self.cursor.fetchone()[0]
+        return range(last_id - count + 1, last_id + 1)
+
+    def _insert(self, sql, returning_sql, params):
+        """
+        Insert a single row and return its ID.
+        """
+        with self.transaction():
+            if _HAS_RETURNING:
+                self.cursor.execute(returning_sql, params)
+                return self.cursor.fetchone()[0]
+            self.cursor.execute(sql, params)
+            return self.cursor.lastrowid
+
+    def create_hotels(self, rows):
+        """
+        Create several hotel records in a single transaction.
+        Returns the range of IDs assigned to the new hotels.
+        Raises sqlite3.IntegrityError if any row violates a constraint,
+        in which case none of the rows are created.
+        """
+        rows = list(rows)
+        with self.transaction():
+            self.cursor.executemany(_SQL_INSERT_HOTEL, rows)
+            return self._inserted_ids(len(rows))
+
+    def create_customers(self, rows):
+        """
+        Create several customer records in a single transaction.
+        Returns the range of IDs assigned to the new customers.
+        Raises sqlite3.IntegrityError if any row violates a constraint,
+        in which case none of the rows are created.
+        """
+        rows = list(rows)
+        with self.transaction():
+            self.cursor.executemany(_SQL_INSERT_CUSTOMER, rows)
+            return self._inserted_ids(len(rows))
+
+    def create_reservations(self, rows):
+        """
+        Create several reservation records in a single transaction.
+        Each row is a (hotel_id, customer_id, date, nights) tuple.
+        Returns the range of IDs assigned to the new reservations.
+        Raises sqlite3.IntegrityError if any row violates a constraint,
+        in which case none of the rows are created.
+        """
+        rows = list(rows)
+        with self.transaction():
+            self.cursor.executemany(_SQL_INSERT_RESERVATION, rows)
+            return self._inserted_ids(len(rows))
+
+    def load_reservations(self, rows, chunk=500):
+        """
+        Load reservations in a single transaction using multi-row
+        INSERT statements of up to chunk rows each.
+        Each row is a (hotel_id, customer_id, date, nights) tuple.
+        Returns the range of IDs assigned to the new reservations.
+        Raises ValueError, and loads nothing, if a row has the wrong
+        number of values.
+        """
+        columns = len(_RESERVATION_COLUMNS)
+        max_variables = self.connection.getlimit(
+            sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER
+        )
+        chunk = max(1, min(chunk, max_variables // columns))
+        rows = iter(rows)
+        total = 0
+        with self.transaction():
+            while True:
+                batch = list(islice(rows, chunk))
+                if not batch:
+                    break
+                for row in batch:
+                    if len(row) != columns:
+                        raise ValueError(
+                            f"Reservation rows need {columns} values, "
+                            f"got {len(row)}: {row!r}"
+                        )
+                self.cursor.execute(
+                    _insert_reservation_rows_sql(len(batch)),
+                    [value for row in batch for value in row]
+                )
+                total += len(batch)
+            return self._inserted_ids(total)
+
+    def load_reservations_dataframe(self, dataframe, chunk=500):
+        """
+        Load reservations from a pandas DataFrame with the columns
+        HOTEL_ID, CUSTOMER_ID, DATE and NIGHTS.
+        Returns the range of IDs assigned to the new reservations.
+        """
+        return self.load_reservations(
+            dataframe[_RESERVATION_COLUMNS].itertuples(
+                index=False,
+                name=None
+            ),
+            chunk
+        )
+
     def create_hotel(self, name=None, location=None):
         """
         Create a new hotel record in the database.
         """
         try:
-            self.cursor.execute(
-                "INSERT INTO Hotel (NAME, LOCATION) VALUES (?, ?)",
+            hotel_id = self._insert(
+                _SQL_INSERT_HOTEL,
+                _SQL_INSERT_HOTEL_RETURNING,
                 (name, location)
             )
-            self.connection.commit()
-            return Hotel(self.cursor.lastrowid, name, location)
+            hotel = Hotel(hotel_id, name, location)
+            _log.debug("Created %r", hotel)
+            return hotel
         except sqlite3.IntegrityError as ex:
-            print("No hotel was created. Review the entered data")
-            print(ex)
+            _log.debug(
+                "No hotel was created. Review the entered data: %s",
+                ex
+            )
             return None
 
     def create_customer(self, name=None, email=None):
@@ -88,15 +611,19 @@ class DatabaseHandler:
         Create a new customer record in the database.
         """
         try:
-            self.cursor.execute(
-                "INSERT INTO Customer (NAME, EMAIL) VALUES (?, ?)",
+            customer_id = self._insert(
+                _SQL_INSERT_CUSTOMER,
+                _SQL_INSERT_CUSTOMER_RETURNING,
                 (name, email)
             )
-            self.connection.commit()
-            return Customer(self.cursor.lastrowid, name, email)
+            customer = Customer(customer_id, name, email)
+            _log.debug("Created %r", customer)
+            return customer
         except sqlite3.IntegrityError as ex:
-            print("No customer was created. Review the entered data")
-            print(ex)
+            _log.debug(
+                "No customer was created. Review the entered data: %s",
+                ex
+            )
             return None
 
     def create_reservation(self,
@@ -108,237 +635,335 @@ class DatabaseHandler:
         Create a new reservation record in the database.
         """
         try:
-            self.cursor.execute(
-                (
-                    "INSERT INTO Reservation "
-                    "(HOTEL_ID, CUSTOMER_ID, DATE, NIGHTS) "
-                    "VALUES (?, ?, ?, ?)"
-                ),
+            reservation_id = self._insert(
+                _SQL_INSERT_RESERVATION,
+                _SQL_INSERT_RESERVATION_RETURNING,
                 (hotel_id, customer_id, date, nights)
             )
-            self.connection.commit()
-            return Reservation(
-                self.cursor.lastrowid,
+            reservation = Reservation(
+                reservation_id,
                 hotel_id, customer_id,
                 date,
                 nights
             )
+            _log.debug("Created %r", reservation)
+            return reservation
         except sqlite3.IntegrityError as ex:
-            print("No reservation was created. Review the entered data")
-            print(ex)
+            _log.debug(
+                "No reservation was created. Review the entered data: %s",
+                ex
+            )
             return None
 
     def update_hotel(self, hotel_id, name, location):
         """
         Update the attributes of a hotel record in the database.
         """
-        self.cursor.execute(
-            "UPDATE Hotel SET NAME = ?, LOCATION = ? WHERE ID = ?",
-            (name, location, hotel_id)
-        )
-        self.connection.commit()
+        with self.transaction():
+            self._invalidate(self._hotel_cache, "hotel_id", hotel_id)
+            self.cursor.execute(
+                _SQL_UPDATE_HOTEL,
+                (name, location, hotel_id)
+            )
 
     def update_customer(self, customer_id, name, email):
         """
         Update the attributes of a customer record in the database.
         """
-        self.cursor.execute(
-            "UPDATE Customer SET name = ?, email = ? WHERE ID = ?",
-            (name, email, customer_id)
-        )
-        self.connection.commit()
+        with self.transaction():
+            self._invalidate(
+                self._customer_cache,
+                "customer_id",
+                customer_id
+            )
+            self.cursor.execute(
+                _SQL_UPDATE_CUSTOMER,
+                (name, email, customer_id)
+            )
 
     def update_reservation(self,
                            reservation_id,
-                           hotel_id,
-                           customer_id,
-                           date,
-                           nights):
+                           hotel_id=None,
+                           customer_id=None,
+                           date=None,
+                           nights=None):
         """
         Update the attributes of a reservation record in the database.
-        """
-        self.cursor.execute(
-            (
-                "UPDATE Reservation SET HOTEL_ID = ?, "
-                "CUSTOMER_ID = ?, DATE = ?, NIGHTS = ? WHERE ID = ?"
-            ),
-            (hotel_id, customer_id, date, nights, reservation_id)
+        Attributes left as None keep their current value.
+        """
+        fields = {
+            "hotel_id": hotel_id,
+            "customer_id": customer_id,
+            "date": date,
+            "nights": nights,
+        }
+        self.update_reservation_fields(
+            reservation_id,
+            **{name: value for name, value in fields.items()
+               if value is not None}
         )
-        self.connection.commit()
+
+    def update_reservation_fields(self, reservation_id, **fields):
+        """
+        Update only the given columns of a reservation record.
+        Accepted fields are hotel_id, customer_id, date and nights.
+        """
+        unknown = set(fields) - set(_RESERVATION_FIELDS)
+        if unknown:
+            raise TypeError(
+                f"Unknown reservation fields: {', '.join(sorted(unknown))}"
+            )
+        if not fields:
+            return
+        names = tuple(sorted(fields))
+        with self.transaction():
+            self.cursor.execute(
+                _update_reservation_sql(names),
+                [fields[name] for name in names] + [reservation_id]
+            )
 
     def delete_hotel(self, hotel_id):
         """
         Delete a hotel record from the database.
         """
-        if not self.get_hotel_by_id(hotel_id):
+        with self.transaction():
+            self._invalidate(self._hotel_cache, "hotel_id", hotel_id)
+            self.cursor.execute(_SQL_DELETE_HOTEL, (hotel_id,))
+            deleted = self.cursor.rowcount
+        if not deleted:
             raise ValueError("No hotel was deleted. Review the entered data")
-        self.cursor.execute("DELETE FROM Hotel WHERE ID = ?", (hotel_id,))
-        self.connection.commit()
 
     def delete_customer(self, customer_id):
         """
         Delete a customer record from the database.
         """
-        if not self.get_customer_by_id(customer_id):
-            raise ValueError
-        self.cursor.execute(
-            "DELETE FROM Customer WHERE ID = ?",
-            (customer_id,)
-        )
-        self.connection.commit()
+        with self.transaction():
+            self._invalidate(
+                self._customer_cache,
+                "customer_id",
+                customer_id
+            )
+            self.cursor.execute(
+                _SQL_DELETE_CUSTOMER,
+                (customer_id,)
+            )
+            deleted = self.cursor.rowcount
+        if not deleted:
+            raise ValueError(
+                "No customer was deleted. Review the entered data"
+            )
 
     def delete_reservation(self, reservation_id):
         """
         Delete a reservation record from the database.
         """
-        if not self.get_reservation_by_id(reservation_id):
+        with self.transaction():
+            self.cursor.execute(
+                _SQL_DELETE_RESERVATION,
+                (reservation_id,)
+            )
+            deleted = self.cursor.rowcount
+        if not deleted:
             raise ValueError(
                 "No reservation was deleted. Review the entered data"
             )
 
-        self.cursor.execute(
-            "DELETE FROM Reservation WHERE ID = ?",
-            (reservation_id,)
-        )
-        self.connection.commit()
-
     def get_hotel_by_id(self, hotel_id):
         """
         Retrieve a hotel record from the database by its ID.
         """
-        self.cursor.execute("SELECT * FROM Hotel WHERE ID = ?", (hotel_id,))
-        result = self.cursor.fetchone()
-        return Hotel(*result) if result else None
+        return self._lookup(
+            self._hotel_cache,
+            ("ID", hotel_id),
+            _SQL_SELECT_HOTEL_BY_ID,
+            (hotel_id,),
+            Hotel
+        )
 
     def get_customer_by_id(self, customer_id):
         """
         Retrieve a customer record from the database by its ID.
         """
-        self.cursor.execute(
-            "SELECT * FROM Customer WHERE ID = ?",
-            (customer_id,)
+        return self._lookup(
+            self._customer_cache,
+            ("ID", customer_id),
+            _SQL_SELECT_CUSTOMER_BY_ID,
+            (customer_id,),
+            Customer
         )
-        result = self.cursor.fetchone()
-        return Customer(*result) if result else None
 
     def get_reservation_by_id(self, reservation_id):
         """
         Retrieve a reservation record from the database by its ID.
         """
-        self.cursor.execute(
-            "SELECT * FROM Reservation WHERE ID = ?",
+        result = self._reader().execute(
+            _SQL_SELECT_RESERVATION_BY_ID,
             (reservation_id,)
-        )
-        result = self.cursor.fetchone()
+        ).fetchone()
         return Reservation(*result) if result else None
 
     def get_hotel_by_name(self, hotel_name):
         """
         Retrieve a hotel record from the database by its name.
         """
-        self.cursor.execute(
-            "SELECT * FROM Hotel WHERE NAME = ?",
-            (hotel_name,)
+        return self._lookup(
+            self._hotel_cache,
+            ("NAME", hotel_name),
+            _SQL_SELECT_HOTEL_BY_NAME,
+            (hotel_name,),
+            Hotel
         )
-        result = self.cursor.fetchone()
-        return Hotel(*result) if result else None
 
     def get_customer_by_email(self, customer_email):
         """
         Retrieve a customer record from the database by its email.
         """
-        self.cursor.execute(
-            "SELECT * FROM Customer WHERE EMAIL = ?",
-            (customer_email,)
+        return self._lookup(
+            self._customer_cache,
+            ("EMAIL", customer_email),
+            _SQL_SELECT_CUSTOMER_BY_EMAIL,
+            (customer_email,),
+            Customer
         )
-        result = self.cursor.fetchone()
-        return Customer(*result) if result else None
 
     def get_reservation_by_details(self, hotel_name, customer_email, date):
         """
-        Retrieve a reservation record from the database by its ID.
+        Retrieve a reservation record from the database by the hotel
+        name, customer email and check-in date.
         """
-        hotel = self.get_hotel_by_name(hotel_name)
-        customer = self.get_customer_by_email(customer_email)
-
-        self.cursor.execute(
-            (
-                "SELECT * FROM Reservation WHERE"
-                "HOTEL_ID = ? AND CUSTOMER_ID = ? AND DATE = ?"
-            ),
-            (hotel.hotel_id, customer.customer_id, date)
-        )
-        result = self.cursor.fetchone()
+        result = self._reader().execute(
+            _SQL_SELECT_RESERVATION_BY_DETAILS,
+            (hotel_name, customer_email, date)
+        ).fetchone()
         return Reservation(*result) if result else None
 
+    def _iter_rows(self, sql, entity_class):
+        """
+        Stream every row of a table as an entity, fetching one page of
+        rows after the last ID seen at a time. Each page is read in full,
+        so no statement on the shared reader stays open between yields
+        and pins a stale snapshot for other lookups.
+        """
+        last_id = 0
+        while rows := self._reader().execute(
+            sql, (last_id, _ITER_BATCH_SIZE)
+        ).fetchall():
+            for row in rows:
+                yield entity_class(*row)
+            last_id = rows[-1][0]
 
+    def iter_hotels(self):
+        """
+        Iterate over every hotel record in the database.
+        """
+        return self._iter_rows(_SQL_SELECT_HOTELS_PAGE, Hotel)
+
+    def iter_customers(self):
+        """
+        Iterate over every customer record in the database.
+        """
+        return self._iter_rows(_SQL_SELECT_CUSTOMERS_PAGE, Customer)
+
+    def iter_reservations(self):
+        """
+        Iterate over every reservation record in the database.
+        """
+        return self._iter_rows(_SQL_SELECT_RESERVATIONS_PAGE, Reservation)
+
+    @contextmanager
+    def _read_snapshot(self):
+        """
+        Yield a connection on which consecutive reads see one snapshot
+        of the database. File databases get a short-lived connection of
+        their own, so lookups on the shared reader keep seeing new
+        commits while the snapshot is open.
+        """
+        reader = self._reader()
+        if reader is self.connection:
+            # Single connection: keep writers out until the reads end
+            with self._write_lock:
+                yield reader
+            return
+        snapshot = self._connect(self.db_name)
+        try:
+            snapshot.execute("BEGIN")
+            yield snapshot
+            snapshot.execute("COMMIT")
+        finally:
+            snapshot.close()
+
+    def reservations_soa(self):
+        """
+        Load every reservation into one NumPy array per column, keyed
+        by reservation_id, hotel_id, customer_id, date and nights.
+        Requires NumPy.
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        with self._read_snapshot() as reader:
+            count = reader.execute(_SQL_COUNT_RESERVATIONS).fetchone()[0]
+            columns = {
+                "reservation_id": np.empty(count, dtype=np.int64),
+                "hotel_id": np.empty(count, dtype=np.int32),
+                "customer_id": np.empty(count, dtype=np.int32),
+                "date": np.empty(count, dtype="datetime64[D]"),
+                "nights": np.empty(count, dtype=np.int16),
+            }
+            rows = reader.execute(_SQL_SELECT_RESERVATION_COLUMNS)
+            for index, row in enumerate(rows):
+                for array, value in zip(columns.values(), row):
+                    array[index] = value
+        return columns
+
+
+@dataclass(slots=True, frozen=True)
 class Hotel:
     """
     A class to represent a hotel entity.
     """
 
-    def __init__(self, hotel_id, name, location):
-        """
-        Initialize the Hotel object with the given attributes.
-        """
-        self.hotel_id = hotel_id
-        self.name = name
-        self.location = location
+    hotel_id: int
+    name: str
+    location: str
 
-    def __str__(self):
+    def describe(self):
         """
-        Return a string representation of the Hotel object.
+        Return a human-readable description of the Hotel object.
         """
-        return f"{self.name} ({self.location})"
+        return _HOTEL_FORMAT.format(self)
 
 
+@dataclass(slots=True, frozen=True)
 class Customer:
     """
     A class to represent a customer entity.
     """
 
-    def __init__(self, customer_id, name, email):
-        """
-        Initialize the Customer object with the given attributes.
-        """
-        self.customer_id = customer_id
-        self.name = name
-        self.email = email
+    customer_id: int
+    name: str
+    email: str
 
-    def __str__(self):
+    def describe(self):
         """
-        Return a string representation of the Customer object.
+        Return a human-readable description of the Customer object.
         """
-        return f"{self.name} ({self.email})"
+        return _CUSTOMER_FORMAT.format(self)
 
 
+@dataclass(slots=True, frozen=True)
 class Reservation:
     """
     A class to represent a reservation entity.
     """
 
-    def __init__(self,
-                 reservation_id,
-                 hotel_id,
-                 customer_id,
-                 check_in_date,
-                 nights
-                 ):
-        """
-        Initialize the Reservation object with the given attributes.
-        """
-        self.reservation_id = reservation_id
-        self.hotel_id = hotel_id
-        self.customer_id = customer_id
-        self.check_in_date = check_in_date
-        self.nights = nights
+    reservation_id: int
+    hotel_id: int
+    customer_id: int
+    check_in_date: str
+    nights: int
 
-    def __str__(self):
+    def describe(self):
         """
-        Return a string representation of the Reservation object.
+        Return a human-readable description of the Reservation object.
         """
-        return f"Reservation ID: {self.reservation_id},"\
-            f"Hotel ID: {self.hotel_id},"\
-            f"Customer ID: {self.customer_id},"\
-            f"Check-in: {self.check_in_date},"\
-            f"Nights: {self.nights}"
+        return _RESERVATION_FORMAT.format(self)
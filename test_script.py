@@ -1,15 +1,12 @@
 """Script to run unittest test cases"""
 
-import unittest
-import coverage
+import subprocess
+import sys
 
-cov = coverage.Coverage()
+COVERAGE = [sys.executable, "-m", "coverage"]
 
-cov.start()
-
-import tests.test_cases
-suite = unittest.TestLoader().discover("tests")
-unittest.TextTestRunner().run(suite)
-
-cov.stop()
-cov.html_report(directory="tests/report")
+status = subprocess.call(
+    COVERAGE + ["run", "-m", "unittest", "discover", "tests"]
+)
+subprocess.call(COVERAGE + ["html", "-d", "tests/report"])
+sys.exit(status)
@@ -1,8 +1,14 @@
 """
 Module that defines test cases for the hotel reservations project
 """
+import importlib.util
+import os
 import sqlite3
+import tempfile
+import threading
 import unittest
+from contextlib import ExitStack
+from unittest import mock
 
 from reservation_system.res_system import (
     Customer,
@@ -16,15 +22,23 @@ class TestDatabaseHandler(unittest.TestCase):
     """
     A class containing unit tests for the DatabaseHandler class.
     """
-    def setUp(self):
-        # Create a temporary database
-        self.db_name = ":memory:"
-        # self.db_name = "data/database.db"
-        self.db_handler = DatabaseHandler(self.db_name)
-
-    def tearDown(self):
+    @classmethod
+    def setUpClass(cls):
+        # Create a temporary database shared by every test
+        cls.db_name = ":memory:"
+        # cls.db_name = "data/database.db"
+        cls.db_handler = DatabaseHandler(cls.db_name)
+
+    @classmethod
+    def tearDownClass(cls):
         # Close the database connection
-        self.db_handler.close_connection()
+        cls.db_handler.close_connection()
+
+    def setUp(self):
+        # Run each test inside a transaction that is rolled back
+        stack = ExitStack()
+        stack.enter_context(self.db_handler.transaction(rollback=True))
+        self.addCleanup(stack.close)
 
     def test_update_hotel(self):
         """
@@ -142,17 +156,299 @@ class TestDatabaseHandler(unittest.TestCase):
 
         self.assertIsNone(deleted_reservation)
 
+    def test_create_hotels_bulk(self):
+        """
+        Test the bulk hotel creation methods
+        """
+        hotel_ids = self.db_handler.create_hotels([
+            ("Hotel A", "Location A"),
+            ("Hotel B", "Location B"),
+        ])
+
+        self.assertEqual(len(hotel_ids), 2)
+        self.assertEqual(
+            self.db_handler.get_hotel_by_id(hotel_ids[1]).name,
+            "Hotel B"
+        )
+
+    def test_transaction_rollback(self):
+        """
+        Test that a failed transaction discards its changes
+        """
+        with self.assertRaises(ValueError):
+            with self.db_handler.transaction():
+                hotel = self.db_handler.create_hotel("Hotel A", "Location A")
+                self.db_handler.update_hotel(
+                    hotel.hotel_id,
+                    "Updated Hotel A",
+                    "Updated Location A"
+                )
+                raise ValueError
+
+        self.assertIsNone(self.db_handler.get_hotel_by_id(hotel.hotel_id))
+
+    def test_get_reservation_by_details(self):
+        """
+        Test retrieving a reservation by hotel name, email and date
+        """
+        hotel = self.db_handler.create_hotel("Hotel A", "Location A")
+        customer = self.db_handler.create_customer(
+            "John Doe",
+            "john@example.com"
+        )
+        reservation = self.db_handler.create_reservation(
+            hotel.hotel_id,
+            customer.customer_id,
+            "2024-02-20",
+            3
+        )
+
+        found = self.db_handler.get_reservation_by_details(
+            "Hotel A",
+            "john@example.com",
+            "2024-02-20"
+        )
+
+        self.assertEqual(found.reservation_id, reservation.reservation_id)
+        self.assertIsNone(
+            self.db_handler.get_reservation_by_details(
+                "Hotel B",
+                "john@example.com",
+                "2024-02-20"
+            )
+        )
+
+    def test_cached_lookups_are_invalidated(self):
+        """
+        Test that cached lookups reflect later updates
+        """
+        db_handler = DatabaseHandler(self.db_name, cache=True)
+        hotel = db_handler.create_hotel("Hotel A", "Location A")
+        db_handler.get_hotel_by_id(hotel.hotel_id)
+        db_handler.get_hotel_by_name("Hotel A")
+        db_handler.update_hotel(hotel.hotel_id, "Hotel B", "Location B")
+
+        self.assertEqual(
+            db_handler.get_hotel_by_id(hotel.hotel_id).name,
+            "Hotel B"
+        )
+        self.assertIsNone(db_handler.get_hotel_by_name("Hotel A"))
+        db_handler.close_connection()
+
+    def test_load_reservations(self):
+        """
+        Test loading reservations with multi-row inserts
+        """
+        hotel = self.db_handler.create_hotel("Hotel A", "Location A")
+        customer = self.db_handler.create_customer(
+            "John Doe",
+            "john@example.com"
+        )
+        reservation_ids = self.db_handler.load_reservations(
+            (
+                (hotel.hotel_id, customer.customer_id, f"2024-02-{day}", 1)
+                for day in range(10, 15)
+            ),
+            chunk=2
+        )
+
+        self.assertEqual(len(reservation_ids), 5)
+        self.assertEqual(
+            self.db_handler.get_reservation_by_id(
+                reservation_ids[-1]
+            ).check_in_date,
+            "2024-02-14"
+        )
+
+    def test_update_reservation_fields(self):
+        """
+        Test updating only some of the reservation attributes
+        """
+        hotel = self.db_handler.create_hotel("Hotel A", "Location A")
+        customer = self.db_handler.create_customer(
+            "John Doe",
+            "john@example.com"
+        )
+        reservation = self.db_handler.create_reservation(
+            hotel.hotel_id,
+            customer.customer_id,
+            "2024-02-20",
+            5
+        )
+
+        self.db_handler.update_reservation_fields(
+            reservation.reservation_id,
+            nights=2
+        )
+        updated_reservation = self.db_handler.get_reservation_by_id(
+            reservation.reservation_id
+        )
+
+        self.assertEqual(updated_reservation.check_in_date, "2024-02-20")
+        self.assertEqual(updated_reservation.nights, 2)
+
+    def test_iter_hotels(self):
+        """
+        Test streaming every hotel record
+        """
+        self.db_handler.create_hotels([
+            ("Hotel A", "Location A"),
+            ("Hotel B", "Location B"),
+        ])
+
+        self.assertEqual(
+            [hotel.name for hotel in self.db_handler.iter_hotels()],
+            ["Hotel A", "Hotel B"]
+        )
+
+    @unittest.skipIf(
+        importlib.util.find_spec("numpy") is None,
+        "numpy is not installed"
+    )
+    def test_reservations_soa(self):
+        """
+        Test loading reservations as NumPy column arrays
+        """
+        hotel = self.db_handler.create_hotel("Hotel A", "Location A")
+        customer = self.db_handler.create_customer(
+            "John Doe",
+            "john@example.com"
+        )
+        self.db_handler.create_reservations([
+            (hotel.hotel_id, customer.customer_id, "2024-02-20", 2),
+            (hotel.hotel_id, customer.customer_id, "2024-03-01", 4),
+        ])
+
+        columns = self.db_handler.reservations_soa()
+
+        self.assertEqual(columns["nights"].tolist(), [2, 4])
+        self.assertEqual(str(columns["date"][1]), "2024-03-01")
+
+    def test_load_reservations_with_deferred_indexes(self):
+        """
+        Test rebuilding the indexes around a load in one transaction
+        """
+        hotel = self.db_handler.create_hotel("Hotel A", "Location A")
+        customer = self.db_handler.create_customer(
+            "John Doe",
+            "john@example.com"
+        )
+
+        with self.db_handler.transaction():
+            self.db_handler.drop_indexes()
+            self.db_handler.load_reservations([
+                (hotel.hotel_id, customer.customer_id, "2024-02-20", 1),
+            ])
+            self.db_handler.create_indexes()
+
+        self.assertIsNotNone(
+            self.db_handler.get_reservation_by_details(
+                "Hotel A",
+                "john@example.com",
+                "2024-02-20"
+            )
+        )
+        self.assertIsNotNone(
+            self.db_handler.connection.execute(
+                "SELECT name FROM sqlite_master WHERE name = ?",
+                ("idx_res_hc_date",)
+            ).fetchone()
+        )
+
+    def test_deferred_indexes_roll_back(self):
+        """
+        Test that a failed load restores the indexes and discards rows
+        """
+        hotel = self.db_handler.create_hotel("Hotel A", "Location A")
+        customer = self.db_handler.create_customer(
+            "John Doe",
+            "john@example.com"
+        )
+
+        with self.assertRaises(ValueError):
+            with self.db_handler.transaction():
+                self.db_handler.drop_indexes()
+                self.db_handler.load_reservations([
+                    (hotel.hotel_id, customer.customer_id, "2024-02-20", 1),
+                ])
+                raise ValueError
+
+        self.assertEqual(list(self.db_handler.iter_reservations()), [])
+        self.assertIsNotNone(
+            self.db_handler.connection.execute(
+                "SELECT name FROM sqlite_master WHERE name = ?",
+                ("idx_res_hc_date",)
+            ).fetchone()
+        )
+
+    @unittest.skipIf(
+        importlib.util.find_spec("pandas") is None,
+        "pandas is not installed"
+    )
+    def test_load_reservations_dataframe(self):
+        """
+        Test loading reservations from a pandas DataFrame
+        """
+        import pandas  # pylint: disable=import-outside-toplevel
+
+        hotel = self.db_handler.create_hotel("Hotel A", "Location A")
+        customer = self.db_handler.create_customer(
+            "John Doe",
+            "john@example.com"
+        )
+        dataframe = pandas.DataFrame({
+            "NIGHTS": [2, 4],
+            "DATE": ["2024-02-20", "2024-03-01"],
+            "CUSTOMER_ID": [customer.customer_id] * 2,
+            "HOTEL_ID": [hotel.hotel_id] * 2,
+        })
+
+        reservation_ids = self.db_handler.load_reservations_dataframe(
+            dataframe
+        )
+
+        reservation = self.db_handler.get_reservation_by_id(
+            reservation_ids[-1]
+        )
+        self.assertEqual(reservation.check_in_date, "2024-03-01")
+        self.assertEqual(reservation.nights, 4)
+
+    def test_describe(self):
+        """
+        Test the human-readable descriptions of the entities
+        """
+        self.assertEqual(
+            Hotel(1, "Hotel A", "Location A").describe(),
+            "Hotel A (Location A)"
+        )
+        self.assertEqual(
+            Customer(1, "John Doe", "john@example.com").describe(),
+            "John Doe (john@example.com)"
+        )
+        self.assertEqual(
+            Reservation(1, 2, 3, "2024-02-20", 5).describe(),
+            "Reservation ID: 1,Hotel ID: 2,Customer ID: 3,"
+            "Check-in: 2024-02-20,Nights: 5"
+        )
+
 
 class TestNegativeCases(unittest.TestCase):
     """
     A class containing negative tests for the DatabaseHandler class.
     """
-    def setUp(self):
-        self.db_name = ":memory:"
-        self.db_handler = DatabaseHandler(self.db_name)
+    @classmethod
+    def setUpClass(cls):
+        cls.db_name = ":memory:"
+        cls.db_handler = DatabaseHandler(cls.db_name)
 
-    def tearDown(self):
-        self.db_handler.close_connection()
+    @classmethod
+    def tearDownClass(cls):
+        cls.db_handler.close_connection()
+
+    def setUp(self):
+        stack = ExitStack()
+        stack.enter_context(self.db_handler.transaction(rollback=True))
+        self.addCleanup(stack.close)
 
     def test_create_hotel_invalid_data(self):
         """
@@ -201,6 +497,272 @@ class TestNegativeCases(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.db_handler.delete_reservation(999)
 
+    def test_update_reservation_unknown_field(self):
+        """
+        Test updating a reservation with an unknown field
+        """
+        with self.assertRaises(TypeError):
+            self.db_handler.update_reservation_fields(1, room=12)
+
+    def test_create_hotels_bulk_invalid_data(self):
+        """
+        Test that a bulk creation with invalid data creates no hotels
+        """
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db_handler.create_hotels([
+                ("Hotel A", "Location A"),
+                ("Hotel A", "Location A"),
+            ])
+        self.assertIsNone(self.db_handler.get_hotel_by_name("Hotel A"))
+
+    def test_load_reservations_wrong_row_width(self):
+        """
+        Test that rows with the wrong number of values are rejected
+        """
+        with self.assertRaises(ValueError):
+            self.db_handler.load_reservations([
+                (1, 1, "2024-02-20", 1, 2),
+                (1, 1, "2024-02-21"),
+            ])
+        self.assertEqual(list(self.db_handler.iter_reservations()), [])
+
+
+class TestFileDatabase(unittest.TestCase):
+    """
+    A class containing tests against a database file, each using its
+    own DatabaseHandler outside of any test transaction.
+    """
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db_name = os.path.join(directory.name, "database.db")
+
+    def test_standalone_write_is_committed(self):
+        """
+        Test that a write outside transaction() is committed
+        """
+        db_handler = DatabaseHandler(self.db_name)
+        hotel = db_handler.create_hotel("Hotel A", "Location A")
+        db_handler.close_connection()
+
+        db_handler = DatabaseHandler(self.db_name)
+        self.addCleanup(db_handler.close_connection)
+        self.assertEqual(
+            db_handler.get_hotel_by_id(hotel.hotel_id).name,
+            "Hotel A"
+        )
+
+    def test_cache_not_stale_after_concurrent_read(self):
+        """
+        Test that a read from another thread during a write does not
+        leave the old row cached after the commit
+        """
+        db_handler = DatabaseHandler(self.db_name, cache=True)
+        self.addCleanup(db_handler.close_connection)
+        hotel = db_handler.create_hotel("Hotel A", "Location A")
+        seen = []
+
+        def read_hotel():
+            seen.append(db_handler.get_hotel_by_id(hotel.hotel_id).name)
+
+        with db_handler.transaction():
+            db_handler.update_hotel(hotel.hotel_id, "Hotel B", "Location B")
+            reader = threading.Thread(target=read_hotel)
+            reader.start()
+            reader.join()
+
+        self.assertEqual(seen, ["Hotel A"])
+        self.assertEqual(
+            db_handler.get_hotel_by_id(hotel.hotel_id).name,
+            "Hotel B"
+        )
+
+    def test_file_database_uses_wal_and_reader(self):
+        """
+        Test that a file database runs in WAL mode and that lookups
+        from another thread see only committed rows during a write
+        """
+        db_handler = DatabaseHandler(self.db_name)
+        self.addCleanup(db_handler.close_connection)
+        hotel = db_handler.create_hotel("Hotel A", "Location A")
+        seen = []
+
+        def read_hotel():
+            seen.append(db_handler.get_hotel_by_id(hotel.hotel_id).name)
+
+        self.assertEqual(
+            db_handler.connection.execute("PRAGMA journal_mode").fetchone()[0],
+            "wal"
+        )
+        with db_handler.transaction():
+            db_handler.update_hotel(hotel.hotel_id, "Hotel B", "Location B")
+            self.assertEqual(
+                db_handler.get_hotel_by_id(hotel.hotel_id).name,
+                "Hotel B"
+            )
+            reader = threading.Thread(target=read_hotel)
+            reader.start()
+            reader.join()
+
+        self.assertEqual(seen, ["Hotel A"])
+
+    def test_temporary_database(self):
+        """
+        Test that an empty database name behaves like :memory:
+        """
+        db_handler = DatabaseHandler("")
+        self.addCleanup(db_handler.close_connection)
+        hotel = db_handler.create_hotel("Hotel A", "Location A")
+
+        self.assertEqual(
+            db_handler.get_hotel_by_id(hotel.hotel_id).name,
+            "Hotel A"
+        )
+
+    def test_sql_trace(self):
+        """
+        Test that RES_SQL_TRACE counts executed statements
+        """
+        with mock.patch.dict(os.environ, {"RES_SQL_TRACE": "1"}):
+            db_handler = DatabaseHandler(self.db_name)
+        db_handler.create_hotel("Hotel A", "Location A")
+        db_handler.create_hotel("Hotel B", "Location B")
+
+        with self.assertLogs("reservation_system.res_system", "INFO") as logs:
+            db_handler.close_connection()
+
+        self.assertIn(
+            "INFO:reservation_system.res_system:"
+            "         2  INSERT INTO Hotel (NAME, LOCATIO",
+            logs.output
+        )
+
+    def test_shared_cache_concurrent_read(self):
+        """
+        Test that lookups from another thread during a write succeed
+        in shared-cache mode and return the committed row
+        """
+        db_handler = DatabaseHandler(self.db_name, shared_cache=True)
+        self.addCleanup(db_handler.close_connection)
+        hotel = db_handler.create_hotel("Hotel A", "Location A")
+        seen = []
+
+        def read_hotel():
+            seen.append(db_handler.get_hotel_by_id(hotel.hotel_id).name)
+
+        with db_handler.transaction():
+            db_handler.update_hotel(hotel.hotel_id, "Hotel B", "Location B")
+            reader = threading.Thread(target=read_hotel)
+            reader.start()
+            reader.join()
+
+        self.assertEqual(seen, ["Hotel A"])
+        self.assertEqual(
+            db_handler.get_hotel_by_id(hotel.hotel_id).name,
+            "Hotel B"
+        )
+
+    def test_failed_commit_rolls_back(self):
+        """
+        Test that a failing COMMIT rolls back and leaves the handler
+        usable for later writes
+        """
+        db_handler = DatabaseHandler(self.db_name)
+        self.addCleanup(db_handler.close_connection)
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            with db_handler.transaction():
+                db_handler.connection.execute(
+                    "PRAGMA defer_foreign_keys = ON"
+                )
+                db_handler.create_reservation(999, 999, "2024-02-20", 1)
+
+        self.assertFalse(db_handler.connection.in_transaction)
+        self.assertEqual(list(db_handler.iter_reservations()), [])
+        self.assertIsNotNone(
+            db_handler.create_hotel("Hotel A", "Location A")
+        )
+
+    def test_shared_cache_handlers_take_turns_writing(self):
+        """
+        Test that a shared-cache handler waits for another handler's
+        write transaction on the same file instead of failing
+        """
+        first = DatabaseHandler(self.db_name, shared_cache=True)
+        self.addCleanup(first.close_connection)
+        second = DatabaseHandler(self.db_name, shared_cache=True)
+        self.addCleanup(second.close_connection)
+        created = []
+
+        def create_hotel():
+            created.append(second.create_hotel("Hotel B", "Location B"))
+
+        with first.transaction():
+            first.create_hotel("Hotel A", "Location A")
+            writer = threading.Thread(target=create_hotel)
+            writer.start()
+            writer.join(0.1)
+
+        writer.join()
+        self.assertEqual(created[0].name, "Hotel B")
+        self.assertEqual(
+            [hotel.name for hotel in first.iter_hotels()],
+            ["Hotel A", "Hotel B"]
+        )
+
+    def test_partly_consumed_iterator_does_not_pin_reads(self):
+        """
+        Test that lookups see an update made while an iterator over the
+        same table is only partly consumed
+        """
+        db_handler = DatabaseHandler(self.db_name, cache=True)
+        self.addCleanup(db_handler.close_connection)
+        hotel_ids = db_handler.create_hotels(
+            (f"Hotel {number}", f"Location {number}")
+            for number in range(300)
+        )
+        hotels = db_handler.iter_hotels()
+        self.assertEqual(next(hotels).name, "Hotel 0")
+
+        db_handler.update_hotel(hotel_ids[-1], "Hotel Z", "Location Z")
+        self.assertEqual(
+            db_handler.get_hotel_by_id(hotel_ids[-1]).name,
+            "Hotel Z"
+        )
+        self.assertEqual(list(hotels)[-1].name, "Hotel Z")
+        del hotels
+        self.assertEqual(
+            db_handler.get_hotel_by_id(hotel_ids[-1]).name,
+            "Hotel Z"
+        )
+
+    def test_read_snapshot_does_not_pin_lookups(self):
+        """
+        Test that lookups see an update committed while a read snapshot
+        is open, and that the snapshot keeps its own view
+        """
+        db_handler = DatabaseHandler(self.db_name, cache=True)
+        self.addCleanup(db_handler.close_connection)
+        hotel = db_handler.create_hotel("Hotel A", "Location A")
+
+        # pylint: disable=protected-access
+        with db_handler._read_snapshot() as snapshot:
+            snapshot.execute("SELECT COUNT(*) FROM Hotel").fetchone()
+            db_handler.update_hotel(hotel.hotel_id, "Hotel B", "Location B")
+            self.assertEqual(
+                db_handler.get_hotel_by_id(hotel.hotel_id).name,
+                "Hotel B"
+            )
+            self.assertEqual(
+                snapshot.execute("SELECT NAME FROM Hotel").fetchone()[0],
+                "Hotel A"
+            )
+
+        self.assertEqual(
+            db_handler.get_hotel_by_id(hotel.hotel_id).name,
+            "Hotel B"
+        )
+
 
 if __name__ == "__main__":
     unittest.main()